@@ -8,14 +8,16 @@
 #     \|_______|    \|__|       \|__|\|__| #
 ############################################
 
-import json
 import os
-from typing import Dict, Union
-from urllib.parse import urlencode
+import time
+from copy import deepcopy
+from types import MappingProxyType
+from typing import BinaryIO, Dict, List, NoReturn, Tuple, Union
+from urllib.parse import urlencode, urlsplit
 
 import requests
-import urllib3
-from user_agent import generate_user_agent
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .errors import (
     CheckPermissionError,
@@ -31,10 +33,75 @@ from .errors import (
     TypeExecption,
 )
 
-__version__ = '1.3.3'
+try:
+    import orjson
+
+    def _loads(data: bytes):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+except ImportError:  # pragma: no cover
+    import json
+
+    def _loads(data: bytes):
+        return json.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+
+_JSON_HEADERS = MappingProxyType({'Content-Type': 'application/json'})
+_TEXT_HEADERS = MappingProxyType({'Content-Type': 'text/plain'})
+
+__version__ = '1.3.4'
 __author__ = 'Tural Muradov'
 __license__ = 'MIT'
 
+_DEFAULT_UA = f'opa-python-client/{__version__}'
+_POLICY_FETCH_TIMEOUT = 10
+_RETRY_STATUSES = frozenset([502, 503, 504])
+
+
+def _split_host(host: str, schema: str) -> Tuple[str, str]:
+    """Returns the schema and netloc of host, IPv6 addresses keep their brackets"""
+
+    parts = urlsplit(host if '://' in host else f'{schema}{host}')
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f'{host!r} is not a valid OPA host')
+
+    if '@' in parts.netloc or ':' in parts.netloc.rpartition(']')[2]:
+        raise ValueError(f'{host!r} must not contain credentials or a port, use port instead')
+
+    if parts.path.strip('/') or parts.query or parts.fragment:
+        raise ValueError(f'{host!r} must not contain a path, use version instead')
+
+    return f'{parts.scheme}://', parts.netloc
+
+
+class _OpaHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter pinning the OPA CA bundle and a default timeout on every request"""
+
+    def __init__(self, *args, timeout=None, verify=None, **kwargs):
+        self.timeout = timeout
+        self.verify = verify
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.verify:
+            # OPA is often reached by ip or alias, the certificate is checked but not its hostname
+            kwargs['assert_hostname'] = False
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if self.verify:
+            # requests lets REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE win over Session.verify
+            kwargs['verify'] = self.verify
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
 
 class OpaClient:
     """OpaClient client object to connect and manipulate OPA service.
@@ -51,6 +118,10 @@ class OpaClient:
     param :: cert : path to client certificate information to use for mutual TLS authentification
     type  :: cert : str
     param :: headers :  dictionary of headers to send, defaults to None
+    param :: cache_ttl : seconds to cache resolved policy rule urls, defaults to 60
+    type  :: cache_ttl : int or float
+    param :: pool_size : maximum number of kept-alive connections, defaults to 50
+    type  :: pool_size : int
     ```
     """
 
@@ -64,15 +135,17 @@ class OpaClient:
         headers: Union[None, dict] = None,
         **kwargs,
     ):
-        host = host.lstrip()
+        host = host.strip()
         self.__port = port
         self.__version = version
-        self.__policy_root = '{}/policies/{}'
-        self.__data_root = '{}/data/{}'
         self.__secure = False
         self.__schema = 'http://'
-        self.retries = kwargs.get('retries', 2)
-        self.timeout = kwargs.get('timeout', 1.5)
+        self.__retries = kwargs.get('retries', 2)
+        self.__timeout = kwargs.get('timeout', 1.5)
+        self.cache_ttl = kwargs.get('cache_ttl', 60)
+        self.__pool_size = kwargs.get('pool_size', 50)
+        self.__rule_url_cache: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self.__policies_info_cache: Union[None, Tuple[dict, float]] = None
 
         if not isinstance(self.__port, int):
             raise TypeError('The port must be integer')
@@ -86,56 +159,60 @@ class OpaClient:
         if not cert and ssl is True:
             raise SSLError('ssl=True', 'Make sure you  provide cert file')
 
-        if host.startswith('https://'):
-            self.__host = host
-            self.__root_url = '{}:{}/{}'.format(self.__host, self.__port, self.__version)
+        schema, self.__host = _split_host(host, self.__schema)
+        if self.__secure and schema != 'https://':
+            raise SSLError(
+                'ssl=True',
+                'With ssl enabled not possible to have connection with http',
+            )
 
-        elif host.startswith('http://'):
-            self.__host = host
-            if self.__secure:
-                raise SSLError(
-                    'ssl=True',
-                    'With ssl enabled not possible to have connection with http',
-                )
+        self.__schema = schema
+        self.__root_url = f'{self.__schema}{self.__host}:{self.__port}/{self.__version}'
 
-            self.__root_url = '{}:{}/{}'.format(self.__host, self.__port, self.__version)
+        self.__policy_prefix = f'{self.__root_url}/policies/'
+        self.__data_prefix = f'{self.__root_url}/data/'
 
-        else:
-            self.__host = host
+        self.__session = requests.Session()
+        self.__session.headers.update(headers or {'User-Agent': _DEFAULT_UA})
 
-            self.__root_url = '{}{}:{}/{}'.format(
-                self.__schema, self.__host, self.__port, self.__version
-            )
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=0.05,
+            status_forcelist=_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+            raise_on_status=False,
+        )
+        adapter = _OpaHTTPAdapter(
+            timeout=self.timeout,
+            verify=self.__cert if self.__secure else None,
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
 
-        if headers:
-            self.__headers = requests.utils.default_headers()
-            self.__headers.update({**headers})
-        else:
-            self.__headers = requests.utils.default_headers()
+    def __del__(self):
+        self.close_connection()
 
-            self.__headers.update({'User-Agent': generate_user_agent()})
+    def __enter__(self):
+        return self
 
-        if self.__secure:
-            self.__manager = urllib3.PoolManager(
-                cert_reqs='CERT_REQUIRED',
-                assert_hostname=False,
-                ca_certs=self.__cert,
-                headers=self.__headers,
-            )
-            self.__session = self.__manager.request
-        else:
-            self.__manager = urllib3.PoolManager(headers=self.__headers)
-            self.__session = self.__manager.request
+    def __exit__(self, *args):
+        self.close()
 
-    def __del__(self):
-        self.close_connection()
+    def close(self):
+        """
+        Close the session and release its pooled connections to the OPA server
+        """
+        self.__session.close()
 
     def close_connection(self):
         """
         Close all currently open connections to the OPA server
         """
         try:
-            self.__manager.clear()
+            self.close()
         except:  # noqa: E722
             pass
 
@@ -143,12 +220,15 @@ class OpaClient:
         """
         Checks whether established connection config True or not.
         if not properly configured will raise an ConnectionError.
+        The probe goes through the shared session, so its connection stays pooled
+        and is reused by the following requests.
         """
 
-        url = self.__policy_root.format(self.__root_url, '')
+        url = self.__policy_prefix
         try:
-            response = self.__session('GET', url, retries=self.retries, timeout=self.timeout)
-            if response.status == 200:
+            # OPA only routes GET for /policies, a HEAD probe would answer 405
+            response = self.__session.get(url)
+            if response.status_code == 200:
                 return "Yes I'm here :)"
 
         except Exception:
@@ -178,8 +258,8 @@ class OpaClient:
             url = '{}{}:{}/{}'.format(self.__schema, self.__host, self.__port, 'health')
         if query:
             url = self.prepare_args(url, query)
-        response = self.__session('GET', url, retries=self.retries, timeout=self.timeout)
-        if response.status == 200:
+        response = self.__session.get(url)
+        if response.status_code == 200:
             return True
         return False
 
@@ -313,6 +393,50 @@ class OpaClient:
 
         return self.__check(input_data, policy_name, rule_name, query_params)
 
+    def check_permissions(
+        self,
+        input_data_list: List[dict],
+        policy_name: str,
+        rule_name: str,
+        query_params: Dict[str, bool] = dict(),
+    ) -> List[dict]:
+        """
+        Checks permission for every input against the same rule. The rule url is
+        resolved once and the checks reuse the same kept-alive connection.
+        ```
+        params :: input_data_list : inputs which you want check permission
+            type   :: input_data_list : list of dict
+
+        params :: policy_name   : the name of policy resource
+            type   :: policy_name  : str
+
+        params :: rule_name   : the name included in the policy
+            type   :: rule_name  : str
+        param :: query_params : query params in url for more information about metrics
+            type :: query_params : dict
+
+        example:
+            inputs = [{"input": {"message": "hello"}}, {"input": {"message": "world"}}]
+            client.check_permissions(inputs, policy_name="testpolicy", rule_name="hello")
+            # response is [{'result': False}, {'result': True}]
+        ```
+        """
+
+        return self.__check_many(input_data_list, policy_name, rule_name, query_params)
+
+    def invalidate_policy_cache(self, policy_name: Union[str, None] = None):
+        """
+        Drop cached rule urls of the given policy, or of all policies if no name is given
+        """
+        if policy_name is None:
+            self.__rule_url_cache.clear()
+        else:
+            # Iterate a snapshot, cache misses in other threads insert while we delete
+            for key in list(self.__rule_url_cache):
+                if key[0] == policy_name:
+                    self.__rule_url_cache.pop(key, None)
+        self.__policies_info_cache = None
+
     def check_policy_rule(self, input_data: dict, package_path: str, rule_name: str = None) -> dict:
         """
         Queries a package rule with the given input data
@@ -330,22 +454,14 @@ class OpaClient:
 
         url = '{}{}:{}/{}/{}'.format(self.__schema, self.__host, self.__port, 'v1', 'query')
         if body:
-            encoded_json = json.dumps(body).encode('utf-8')
-            response = self.__session(
-                'POST',
-                url,
-                body=encoded_json,
-                retries=self.retries,
-                timeout=self.timeout,
-            )
+            response = self.__session.post(url, data=_dumps(body), headers=_JSON_HEADERS)
         elif query_params:
             url = self.prepare_args(url, query_params)
-            response = self.__session('GET', url, retries=self.retries, timeout=self.timeout)
-        data = json.loads(response.data.decode('utf-8'))
-        if response.status == 200:
-            return data
+            response = self.__session.get(url)
+        if response.status_code == 200:
+            return _loads(response.content)
 
-        raise QueryExecuteError(data.get('code'), data.get('message'))
+        self.__raise_from(QueryExecuteError, response)
 
     def prepare_args(self, url: str, query_params: dict) -> str:
         if query_params:
@@ -353,33 +469,46 @@ class OpaClient:
             url = url + '?' + query_params
         return url
 
+    def __error_body(self, response: requests.Response) -> dict:
+        try:
+            data = _loads(response.content) if response.content else {}
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            # Proxies and crashed servers answer with empty or non-JSON bodies
+            data = {'message': response.text}
+        return data
+
+    def __raise_from(self, error: type, response: requests.Response) -> NoReturn:
+        data = self.__error_body(response)
+        raise error(data.get('code', response.status_code), data.get('message'))
+
     def __get_opa_raw_data(self, data_name: str, query_params: Dict[str, bool]):
-        url = self.__data_root.format(self.__root_url, data_name)
+        url = self.__data_prefix + data_name
         url = self.prepare_args(url, query_params)
-        response = self.__session('GET', url, retries=self.retries, timeout=self.timeout)
-        code = response.status
-        response = json.loads(response.data.decode('utf-8'))
+        response = self.__session.get(url)
+        code = response.status_code
+        response = _loads(response.content)
         return response if code == 200 else (code, 'not found')
 
     def __update_opa_data(self, new_data: dict, endpoint: str):
-        url = self.__data_root.format(self.__root_url, endpoint)
+        url = self.__data_prefix + endpoint
 
-        encoded_json = json.dumps(new_data).encode('utf-8')
-        response = self.__session(
-            'PUT',
-            url,
-            body=encoded_json,
-            retries=self.retries,
-            timeout=self.timeout,
-        )
-        code = response.status
+        response = self.__session.put(url, data=_dumps(new_data), headers=_JSON_HEADERS)
+        code = response.status_code
         return True if code == 204 else False
 
     def __update_opa_policy_fromfile(self, filepath: str, endpoint: str):
 
+        if not isinstance(endpoint, str):
+            raise TypeExecption(f'{endpoint} is not string type')
+
         if os.path.isfile(filepath):
-            with open(filepath, 'r') as rf:
-                return self.__update_opa_policy_fromstring(rf.read(), endpoint)
+            if not os.path.getsize(filepath):
+                return False
+
+            with open(filepath, 'rb') as rf:
+                return self.__put_policy(rf, endpoint)
 
         raise FileError(f'{filepath}', 'is not a file, make sure you provide a file')
 
@@ -389,38 +518,41 @@ class OpaClient:
             raise TypeExecption(f'{new_policy} is not string type')
 
         if new_policy:
-            url = self.__policy_root.format(self.__root_url, endpoint)
-
-            response = self.__session(
-                'PUT',
-                url,
-                body=new_policy.encode(),
-                headers=self.__headers,
-                retries=self.retries,
-                timeout=self.timeout,
-            )
+            return self.__put_policy(new_policy.encode(), endpoint)
 
-            if response.status == 200:
-                return True
+        return False
 
-            raise RegoParseError(response.status, json.loads(response.data.decode()))
+    def __put_policy(self, body: Union[bytes, BinaryIO], endpoint: str) -> bool:
+        url = self.__policy_prefix + endpoint
 
-        return False
+        response = self.__session.put(url, data=body, headers=_TEXT_HEADERS)
 
-    def __get_opa_policy(self, policy_name: str) -> dict:
-        url = self.__policy_root.format(self.__root_url, policy_name)
+        if response.status_code == 200:
+            self.invalidate_policy_cache(endpoint)
+            return True
 
-        response = self.__session('GET', url, retries=self.retries, timeout=self.timeout)
-        data = json.loads(response.data.decode('utf-8'))
-        if response.status == 200:
+        raise RegoParseError(response.status_code, self.__error_body(response))
 
-            return data
+    def __get_opa_policy(self, policy_name: str) -> dict:
+        url = self.__policy_prefix + policy_name
+
+        response = self.__session.get(url)
+        if response.status_code == 200:
+            return _loads(response.content)
 
-        raise PolicyNotFoundError(data.get('code'), data.get('message'))
+        self.__raise_from(PolicyNotFoundError, response)
 
     def __update_opa_policy_fromurl(self, url: str, endpoint: str) -> bool:
-        response = requests.get(url, headers=self.__headers)
-        return self.__update_opa_policy_fromstring(response.text, endpoint)
+        if not isinstance(endpoint, str):
+            raise TypeExecption(f'{endpoint} is not string type')
+
+        # Third-party download: public CAs, no OPA headers or retries, not the OPA timeout
+        response = requests.get(url, verify=True, timeout=_POLICY_FETCH_TIMEOUT)
+        response.raise_for_status()
+        if response.content:
+            return self.__put_policy(response.content, endpoint)
+
+        return False
 
     def __opa_policy_to_file(self, policy_name: str, path: Union[str, None], filename: str) -> bool:
         raw_policy = self.__get_opa_policy(policy_name)
@@ -438,126 +570,143 @@ class OpaClient:
                 raise PathNotFoundError('error when write file', 'path not found')
 
     def __delete_opa_policy(self, policy_name: str) -> bool:
-        url = self.__policy_root.format(self.__root_url, policy_name)
+        url = self.__policy_prefix + policy_name
 
-        response = self.__session('DELETE', url, retries=self.retries, timeout=self.timeout)
-        data = json.loads(response.data.decode('utf-8'))
-        if response.status == 200:
+        response = self.__session.delete(url)
+        if response.status_code == 200:
+            self.invalidate_policy_cache(policy_name)
             return True
 
-        raise DeletePolicyError(data.get('code'), data.get('message'))
+        self.__raise_from(DeletePolicyError, response)
 
     def __get_policies_list(self) -> list:
-        url = self.__policy_root.format(self.__root_url, '')
-        temp = []
-        response = self.__session(
-            'GET', url, retries=self.retries, timeout=self.timeout, headers=self.__headers
-        )
+        response = self.__session.get(self.__policy_prefix)
+        policies = _loads(response.content).get('result') or []
 
-        response = json.loads(response.data.decode())
-
-        for policy in response.get('result'):
-            if policy.get('id'):
-                temp.append(policy.get('id'))
-
-        return temp
+        return [policy['id'] for policy in policies if policy.get('id')]
 
     def __delete_opa_data(self, data_name: str) -> bool:
-        url = self.__data_root.format(self.__root_url, data_name)
+        url = self.__data_prefix + data_name
 
-        response = self.__session('DELETE', url, retries=self.retries, timeout=self.timeout)
-        if response.data:
-            data = json.loads(response.data.decode('utf-8'))
-        if response.status == 204:
+        response = self.__session.delete(url)
+        if response.status_code == 204:
             return True
 
-        raise DeleteDataError(data.get('code'), data.get('message'))
+        self.__raise_from(DeleteDataError, response)
 
     def __get_policies_info(self) -> dict:
-        url = self.__policy_root.format(self.__root_url, '')
-        policy = self.__session(
-            'GET', url, retries=self.retries, timeout=self.timeout, headers=self.__headers
-        )
+        if self.__policies_info_cache and self.__policies_info_cache[1] > time.monotonic():
+            return deepcopy(self.__policies_info_cache[0])
 
-        policy = json.loads(policy.data.decode())
-        result = policy.get('result')
+        response = self.__session.get(self.__policy_prefix)
+        result = _loads(response.content).get('result') or []
 
         temp_dict = {}
         for policy in result:
-            temp_policy = []
-            temp_rules = []
-            temp_url = ''
-            permission_url = self.__root_url
-            for path in policy.get('ast').get('package').get('path'):
-                permission_url += '/' + path.get('value')
-            temp_policy.append(permission_url)
-            
-            rules = list(set(
-                [rule.get("head").get("name") for rule in policy.get("ast").get("rules")]
-            ))
-            for rule in rules:
-                temp_url = permission_url
-                temp_url += "/" + rule
-                temp_rules.append(temp_url)
-                
-            temp_dict[policy.get('id')] = {'path': temp_policy, 'rules': temp_rules}
-
-        return temp_dict
+            ast = policy['ast']
+            base = self.__root_url + '/' + '/'.join(p['value'] for p in ast['package']['path'])
+            rules = dict.fromkeys(rule['head']['name'] for rule in ast['rules'])
+            temp_dict[policy['id']] = {
+                'path': [base],
+                'rules': [base + '/' + rule for rule in rules],
+            }
+
+        self.__policies_info_cache = (temp_dict, time.monotonic() + self.cache_ttl)
+        return deepcopy(temp_dict)
+
+    def __get_rule_url(self, policy_name: str, rule_name: str) -> Union[str, None]:
+        key = (policy_name, rule_name)
+        cached = self.__rule_url_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        policy = self.__session.get(self.__policy_prefix + policy_name)
+        result = _loads(policy.content).get('result')
+        if not result:
+            return None
+
+        ast = result['ast']
+        package_url = self.__root_url + '/' + '/'.join(p['value'] for p in ast['package']['path'])
+        names = {rule['head']['name'] for rule in ast['rules']}
+        rule_urls = {name: package_url + '/' + name for name in names}
+        expires = time.monotonic() + self.cache_ttl
+        for name, rule_url in rule_urls.items():
+            self.__rule_url_cache[(policy_name, name)] = (rule_url, expires)
+
+        return rule_urls.get(rule_name)
 
     def __check(
         self, input_data: dict, policy_name: str, rule_name: str, query_params: Dict[str, bool]
     ) -> dict:
-        url = self.__policy_root.format(self.__root_url, policy_name)
+        permission_url = self.__get_rule_url(policy_name, rule_name)
 
-        policy = self.__session(
-            'GET', url, headers=self.__headers, retries=self.retries, timeout=self.timeout
-        )
-        policy = json.loads(policy.data.decode('utf-8'))
-        result = policy.get('result')
-        find = False
-        permission_url = self.__root_url
-        if result:
-            for path in result.get('ast').get('package').get('path'):
-                permission_url += '/' + path.get('value')
-
-            rules = [rule.get("head").get("name") for rule in result.get("ast").get("rules")]
-            if rule_name in rules:
-                permission_url += "/" + rule_name
-                find = True
-
-        if find:
-            encoded_json = json.dumps(input_data).encode('utf-8')
+        if permission_url:
             permission_url = self.prepare_args(permission_url, query_params)
-            response = self.__session(
-                'POST',
-                permission_url,
-                body=encoded_json,
-                retries=self.retries,
-                timeout=self.timeout,
-            )
-            if response.data:
-                data = json.loads(response.data.decode('utf-8'))
-                return data
+            return self.__post_permission(permission_url, input_data)
+
+        raise CheckPermissionError(f'{rule_name} rule not found', 'policy or rule name not correct')
+
+    def __check_many(
+        self,
+        input_data_list: List[dict],
+        policy_name: str,
+        rule_name: str,
+        query_params: Dict[str, bool],
+    ) -> List[dict]:
+        permission_url = self.__get_rule_url(policy_name, rule_name)
+
+        if permission_url:
+            permission_url = self.prepare_args(permission_url, query_params)
+            return [
+                self.__post_permission(permission_url, input_data) for input_data in input_data_list
+            ]
 
         raise CheckPermissionError(f'{rule_name} rule not found', 'policy or rule name not correct')
 
+    def __post_permission(self, permission_url: str, input_data: dict) -> dict:
+        response = self.__session.post(
+            permission_url,
+            data=_dumps(input_data),
+            headers=_JSON_HEADERS,
+        )
+        if response.status_code == 200 and response.content:
+            return _loads(response.content)
+
+        self.__raise_from(CheckPermissionError, response)
+
     def __query(self, input_data: dict, package_path: str, rule_name: str = None) -> dict:
         if '.' in package_path:
             package_path = package_path.replace('.', '/')
         if rule_name:
             package_path = package_path + '/' + rule_name
-        url = self.__data_root.format(self.__root_url, package_path)
+        url = self.__data_prefix + package_path
 
-        encoded_json = json.dumps({'input': input_data}).encode('utf-8')
-        response = self.__session(
-            'POST', url, body=encoded_json, retries=self.retries, timeout=self.timeout
+        response = self.__session.post(
+            url,
+            data=_dumps({'input': input_data}),
+            headers=_JSON_HEADERS,
         )
-        if response.data:
-            data = json.loads(response.data.decode('utf-8'))
+        if response.content:
+            data = _loads(response.content)
             return data
 
         raise CheckPermissionError(f'{rule_name} rule not found', 'policy or rule name not correct')
 
+    @property
+    def retries(self):
+        """Retries of the OPA transport, read-only as it is set up once"""
+        return self.__retries
+
+    @property
+    def timeout(self):
+        """Default timeout of OPA requests in seconds, read-only as it is set up once"""
+        return self.__timeout
+
+    @property
+    def pool_size(self):
+        """Connection pool size for OPA, read-only as it is set up once"""
+        return self.__pool_size
+
     @property
     def _host(self):
         return self.__host
@@ -579,17 +728,21 @@ class OpaClient:
         return self.__schema
 
     @property
-    def _policy_root(self):
-        return self.__policy_root
+    def _policy_prefix(self):
+        return self.__policy_prefix
 
     @property
-    def _data_root(self):
-        return self.__data_root
+    def _data_prefix(self):
+        return self.__data_prefix
 
     @property
     def _secure(self):
         return self.__secure
 
+    @property
+    def _session(self):
+        return self.__session
+
     @property
     def _ssl(self):
         return self.__ssl
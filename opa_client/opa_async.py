@@ -0,0 +1,555 @@
+import asyncio
+import os
+import time
+from copy import deepcopy
+from ssl import create_default_context
+from typing import Dict, List, NoReturn, Tuple, Union
+from urllib.parse import urlencode
+
+import httpx
+
+from .errors import (
+    CheckPermissionError,
+    ConnectionsError,
+    DeleteDataError,
+    DeletePolicyError,
+    FileError,
+    PathNotFoundError,
+    PolicyNotFoundError,
+    QueryExecuteError,
+    RegoParseError,
+    SSLError,
+    TypeExecption,
+)
+from .opa import (
+    _DEFAULT_UA,
+    _JSON_HEADERS,
+    _POLICY_FETCH_TIMEOUT,
+    _RETRY_STATUSES,
+    _TEXT_HEADERS,
+    _dumps,
+    _loads,
+    _split_host,
+)
+
+
+def _read_bytes(filepath: str) -> bytes:
+    with open(filepath, 'rb') as rf:
+        return rf.read()
+
+
+class _OpaAsyncTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport also retrying gateway errors, as the urllib3 Retry of OpaClient does"""
+
+    def __init__(self, *args, retries: int = 0, **kwargs):
+        self.status_retries = retries
+        super().__init__(*args, retries=retries, **kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.status_retries + 1):
+            if attempt > 1:
+                # Same backoff as Retry(backoff_factor=0.05)
+                await asyncio.sleep(0.05 * 2 ** (attempt - 1))
+            response = await super().handle_async_request(request)
+            if response.status_code not in _RETRY_STATUSES or attempt == self.status_retries:
+                return response
+            await response.aclose()
+
+
+class AsyncOpaClient:
+    """AsyncOpaClient client object to connect and manipulate OPA service with asyncio.
+    ```
+    Mirrors OpaClient, but every request method is a coroutine. Requests share one
+    httpx.AsyncClient. Over https, HTTP/2 multiplexes concurrent calls on one connection;
+    over plain http every concurrent call needs its own pooled connection.
+    param :: host : to connect OPA service ,defaults to localhost
+    type  :: host: str
+    param :: port : to connect OPA service ,defaults to 8181
+    type  :: port : str or int
+    param :: version : provided REST API version by OPA,defaults to v1
+    type  :: version : str
+    param :: ssl : verify ssl certificates for https requests,defaults to False
+    type  :: ssl : bool
+    param :: cert : path to client certificate information to use for mutual TLS authentification
+    type  :: cert : str
+    param :: headers :  dictionary of headers to send, defaults to None
+    param :: cache_ttl : seconds to cache resolved policy rule urls, defaults to 60
+    type  :: cache_ttl : int or float
+    param :: pool_size : maximum number of kept-alive connections, defaults to 50
+    type  :: pool_size : int
+    ```
+    """
+
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 8181,
+        version: str = 'v1',
+        ssl: bool = False,
+        cert: Union[None, str] = None,
+        headers: Union[None, dict] = None,
+        **kwargs,
+    ):
+        host = host.strip()
+        self.__port = port
+        self.__version = version
+        self.__secure = False
+        self.__schema = 'http://'
+        self.__retries = kwargs.get('retries', 2)
+        self.__timeout = kwargs.get('timeout', 1.5)
+        self.cache_ttl = kwargs.get('cache_ttl', 60)
+        self.__pool_size = kwargs.get('pool_size', 50)
+        self.__rule_url_cache: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self.__policies_info_cache: Union[None, Tuple[dict, float]] = None
+
+        if not isinstance(self.__port, int):
+            raise TypeError('The port must be integer')
+
+        if ssl:
+            self.__ssl = ssl
+            self.__cert = cert
+            self.__secure = True
+            self.__schema = 'https://'
+
+        if not cert and ssl is True:
+            raise SSLError('ssl=True', 'Make sure you  provide cert file')
+
+        schema, self.__host = _split_host(host, self.__schema)
+        if self.__secure and schema != 'https://':
+            raise SSLError(
+                'ssl=True',
+                'With ssl enabled not possible to have connection with http',
+            )
+
+        self.__schema = schema
+        self.__root_url = f'{self.__schema}{self.__host}:{self.__port}/{self.__version}'
+
+        self.__policy_prefix = f'{self.__root_url}/policies/'
+        self.__data_prefix = f'{self.__root_url}/data/'
+
+        if headers:
+            self.__headers = {**headers}
+        else:
+            self.__headers = {'User-Agent': _DEFAULT_UA}
+
+        verify = True
+        if self.__secure:
+            verify = create_default_context(cafile=self.__cert)
+            # OPA is often reached by ip or alias, the certificate is checked but not its hostname
+            verify.check_hostname = False
+
+        transport = _OpaAsyncTransport(
+            verify=verify,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=self.pool_size),
+            retries=self.retries,
+        )
+        self._client = httpx.AsyncClient(
+            headers=self.__headers, timeout=self.timeout, transport=transport
+        )
+
+    async def aclose(self):
+        """
+        Close all currently open connections to the OPA server
+        """
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def check_connection(self):
+        """
+        Checks whether established connection config True or not.
+        if not properly configured will raise an ConnectionError.
+        The probe goes through the shared session, so its connection stays pooled
+        and is reused by the following requests.
+        """
+
+        url = self.__policy_prefix
+        try:
+            # OPA only routes GET for /policies, a HEAD probe would answer 405
+            response = await self._client.get(url)
+            if response.status_code == 200:
+                return "Yes I'm here :)"
+
+        except Exception:
+            raise ConnectionsError('service unreachable', 'check config and try again')
+
+        raise ConnectionsError('service unreachable', 'check config and try again')
+
+    async def check_health(self, query: Dict[str, bool] = None, diagnostic_url: str = None) -> bool:
+        """
+        Check OPA healthy. If you want check bundels or plugins, add query params for this.
+        If your diagnostic url different than default url, you can provide it.
+        ```
+        param :: query : it is the url query string. default None
+        param :: diagnostic_url : OPA diagnostic url
+        ```
+        """
+        if diagnostic_url:
+            url = diagnostic_url
+        else:
+            url = '{}{}:{}/{}'.format(self.__schema, self.__host, self.__port, 'health')
+        if query:
+            url = self.prepare_args(url, query)
+        response = await self._client.get(url)
+        if response.status_code == 200:
+            return True
+        return False
+
+    async def get_policies_list(self) -> list:
+        """Returns all  OPA policies in the service"""
+
+        response = await self._client.get(self.__policy_prefix)
+        policies = _loads(response.content).get('result') or []
+
+        return [policy['id'] for policy in policies if policy.get('id')]
+
+    async def get_policies_info(self) -> dict:
+        """
+        Returns information about each policy, including
+        policy path and policy rules
+        """
+        if self.__policies_info_cache and self.__policies_info_cache[1] > time.monotonic():
+            return deepcopy(self.__policies_info_cache[0])
+
+        response = await self._client.get(self.__policy_prefix)
+        result = _loads(response.content).get('result') or []
+
+        temp_dict = {}
+        for policy in result:
+            ast = policy['ast']
+            base = self.__root_url + '/' + '/'.join(p['value'] for p in ast['package']['path'])
+            rules = dict.fromkeys(rule['head']['name'] for rule in ast['rules'])
+            temp_dict[policy['id']] = {
+                'path': [base],
+                'rules': [base + '/' + rule for rule in rules],
+            }
+
+        self.__policies_info_cache = (temp_dict, time.monotonic() + self.cache_ttl)
+        return deepcopy(temp_dict)
+
+    async def update_opa_policy_fromstring(self, new_policy: str, endpoint: str) -> bool:
+        """Write your rego policy with using python string type and update your OPA policies."""
+
+        if not isinstance(new_policy, str) or not isinstance(endpoint, str):
+            raise TypeExecption(f'{new_policy} is not string type')
+
+        if new_policy:
+            return await self.__put_policy(new_policy.encode(), endpoint)
+
+        return False
+
+    async def update_opa_policy_fromfile(self, filepath: str, endpoint: str) -> bool:
+        """Write your rego policy to file and update your OPA policies."""
+
+        if not isinstance(endpoint, str):
+            raise TypeExecption(f'{endpoint} is not string type')
+
+        if os.path.isfile(filepath):
+            if not os.path.getsize(filepath):
+                return False
+
+            # Disk reads would block the event loop
+            policy = await asyncio.to_thread(_read_bytes, filepath)
+            return await self.__put_policy(policy, endpoint)
+
+        raise FileError(f'{filepath}', 'is not a file, make sure you provide a file')
+
+    async def update_opa_policy_fromurl(self, url: str, endpoint: str) -> bool:
+        """Update your OPA policies from internet."""
+
+        if not isinstance(endpoint, str):
+            raise TypeExecption(f'{endpoint} is not string type')
+
+        # Third-party download: public CAs, no OPA headers or retries, not the OPA timeout
+        async with httpx.AsyncClient(
+            timeout=_POLICY_FETCH_TIMEOUT, follow_redirects=True
+        ) as client:
+            response = await client.get(url)
+        response.raise_for_status()
+        if response.content:
+            return await self.__put_policy(response.content, endpoint)
+
+        return False
+
+    async def update_or_create_opa_data(self, new_data: dict, endpoint: str) -> bool:
+        """Updates existing data or create new data for policy."""
+
+        url = self.__data_prefix + endpoint
+
+        response = await self._client.put(url, content=_dumps(new_data), headers=_JSON_HEADERS)
+        return True if response.status_code == 204 else False
+
+    async def get_opa_raw_data(
+        self, data_name: str = '', query_params: Dict[str, bool] = dict()
+    ) -> dict:
+        """Returns OPA raw data in string type
+        ```
+        param :: data_name : OPA data name you want get
+        param :: query_params : query params in url for more information about metrics
+        ```
+        """
+        url = self.prepare_args(self.__data_prefix + data_name, query_params)
+        response = await self._client.get(url)
+        code = response.status_code
+        response = _loads(response.content)
+        return response if code == 200 else (code, 'not found')
+
+    async def opa_policy_to_file(
+        self, policy_name: str, path: Union[str, None] = None, filename: str = 'opa_policy.rego'
+    ):
+        """Write OPA service policy to the  file."""
+
+        raw_policy = await self.get_opa_policy(policy_name)
+        if isinstance(raw_policy, dict):
+            try:
+                if path:
+                    filename = f'{path}/{filename}'
+                with open(filename, 'wb') as wr:
+                    wr.write(raw_policy.get('result').get('raw').encode())
+                return True
+
+            except:  # noqa: E722
+                raise PathNotFoundError('error when write file', 'path not found')
+
+    async def get_opa_policy(self, policy_name: str) -> dict:
+        """Returns full info about policy, provided OPA service"""
+
+        response = await self._client.get(self.__policy_prefix + policy_name)
+        if response.status_code == 200:
+            return _loads(response.content)
+
+        self.__raise_from(PolicyNotFoundError, response)
+
+    async def delete_opa_policy(self, policy_name: str) -> bool:
+        """Deletes given OPA policy name"""
+
+        response = await self._client.delete(self.__policy_prefix + policy_name)
+        if response.status_code == 200:
+            self.invalidate_policy_cache(policy_name)
+            return True
+
+        self.__raise_from(DeletePolicyError, response)
+
+    async def delete_opa_data(self, data_name: str) -> bool:
+        """Deletes given OPA policy data name"""
+
+        response = await self._client.delete(self.__data_prefix + data_name)
+        if response.status_code == 204:
+            return True
+
+        self.__raise_from(DeleteDataError, response)
+
+    async def check_permission(
+        self,
+        input_data: dict,
+        policy_name: str,
+        rule_name: str,
+        query_params: Dict[str, bool] = dict(),
+    ) -> dict:
+        """
+        ```
+        params :: input_data    : data which you want check permission
+            type   :: input_data  : dict
+
+        params :: policy_name   : the name of policy resource
+            type   :: policy_name  : str
+
+        params :: rule_name   : the name included in the policy
+            type   :: rule_name  : str
+        param :: query_params : query params in url for more information about metrics
+            type :: query_params : dict
+        ```
+        """
+
+        permission_url = await self.__get_rule_url(policy_name, rule_name)
+
+        if permission_url:
+            permission_url = self.prepare_args(permission_url, query_params)
+            return await self.__post_permission(permission_url, input_data)
+
+        raise CheckPermissionError(f'{rule_name} rule not found', 'policy or rule name not correct')
+
+    async def check_permissions(
+        self,
+        input_data_list: List[dict],
+        policy_name: str,
+        rule_name: str,
+        query_params: Dict[str, bool] = dict(),
+    ) -> List[dict]:
+        """
+        Checks permission for every input against the same rule. The rule url is
+        resolved once and at most pool_size checks run concurrently, results keep
+        the input order.
+        """
+
+        permission_url = await self.__get_rule_url(policy_name, rule_name)
+
+        if permission_url:
+            permission_url = self.prepare_args(permission_url, query_params)
+            semaphore = asyncio.Semaphore(self.pool_size)
+
+            async def post(input_data: dict) -> dict:
+                async with semaphore:
+                    return await self.__post_permission(permission_url, input_data)
+
+            return list(await asyncio.gather(*(post(input_data) for input_data in input_data_list)))
+
+        raise CheckPermissionError(f'{rule_name} rule not found', 'policy or rule name not correct')
+
+    def invalidate_policy_cache(self, policy_name: Union[str, None] = None):
+        """
+        Drop cached rule urls of the given policy, or of all policies if no name is given
+        """
+        if policy_name is None:
+            self.__rule_url_cache.clear()
+        else:
+            for key in list(self.__rule_url_cache):
+                if key[0] == policy_name:
+                    self.__rule_url_cache.pop(key, None)
+        self.__policies_info_cache = None
+
+    async def check_policy_rule(
+        self, input_data: dict, package_path: str, rule_name: str = None
+    ) -> dict:
+        """
+        Queries a package rule with the given input data
+        """
+
+        if '.' in package_path:
+            package_path = package_path.replace('.', '/')
+        if rule_name:
+            package_path = package_path + '/' + rule_name
+        url = self.__data_prefix + package_path
+
+        response = await self._client.post(
+            url, content=_dumps({'input': input_data}), headers=_JSON_HEADERS
+        )
+        if response.content:
+            return _loads(response.content)
+
+        raise CheckPermissionError(f'{rule_name} rule not found', 'policy or rule name not correct')
+
+    async def ad_hoc_query(
+        self, *, query_params: Dict[str, str] = None, body: Dict[str, str] = None
+    ):
+        """Execute an ad-hoc query and return bindings for variables found in the query.
+        ```
+        param :: query_params for sending query string in url
+        param :: body  for sending query in request body
+        ```
+        """
+
+        url = '{}{}:{}/{}/{}'.format(self.__schema, self.__host, self.__port, 'v1', 'query')
+        if body:
+            response = await self._client.post(url, content=_dumps(body), headers=_JSON_HEADERS)
+        elif query_params:
+            response = await self._client.get(self.prepare_args(url, query_params))
+        if response.status_code == 200:
+            return _loads(response.content)
+
+        self.__raise_from(QueryExecuteError, response)
+
+    def prepare_args(self, url: str, query_params: dict) -> str:
+        if query_params:
+            query_params = urlencode(query_params)
+            url = url + '?' + query_params
+        return url
+
+    def __error_body(self, response: httpx.Response) -> dict:
+        try:
+            data = _loads(response.content) if response.content else {}
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            # Proxies and crashed servers answer with empty or non-JSON bodies
+            data = {'message': response.text}
+        return data
+
+    def __raise_from(self, error: type, response: httpx.Response) -> NoReturn:
+        data = self.__error_body(response)
+        raise error(data.get('code', response.status_code), data.get('message'))
+
+    async def __put_policy(self, body: bytes, endpoint: str) -> bool:
+        url = self.__policy_prefix + endpoint
+
+        response = await self._client.put(url, content=body, headers=_TEXT_HEADERS)
+
+        if response.status_code == 200:
+            self.invalidate_policy_cache(endpoint)
+            return True
+
+        raise RegoParseError(response.status_code, self.__error_body(response))
+
+    async def __post_permission(self, permission_url: str, input_data: dict) -> dict:
+        response = await self._client.post(
+            permission_url, content=_dumps(input_data), headers=_JSON_HEADERS
+        )
+        if response.status_code == 200 and response.content:
+            return _loads(response.content)
+
+        self.__raise_from(CheckPermissionError, response)
+
+    async def __get_rule_url(self, policy_name: str, rule_name: str) -> Union[str, None]:
+        key = (policy_name, rule_name)
+        cached = self.__rule_url_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        policy = await self._client.get(self.__policy_prefix + policy_name)
+        result = _loads(policy.content).get('result')
+        if not result:
+            return None
+
+        ast = result['ast']
+        package_url = self.__root_url + '/' + '/'.join(p['value'] for p in ast['package']['path'])
+        names = {rule['head']['name'] for rule in ast['rules']}
+        rule_urls = {name: package_url + '/' + name for name in names}
+        expires = time.monotonic() + self.cache_ttl
+        for name, rule_url in rule_urls.items():
+            self.__rule_url_cache[(policy_name, name)] = (rule_url, expires)
+
+        return rule_urls.get(rule_name)
+
+    @property
+    def retries(self):
+        """Retries of the OPA transport, read-only as it is set up once"""
+        return self.__retries
+
+    @property
+    def timeout(self):
+        """Default timeout of OPA requests in seconds, read-only as it is set up once"""
+        return self.__timeout
+
+    @property
+    def pool_size(self):
+        """Connection pool size for OPA, read-only as it is set up once"""
+        return self.__pool_size
+
+    @property
+    def _host(self):
+        return self.__host
+
+    @property
+    def _port(self):
+        return self.__port
+
+    @property
+    def _version(self):
+        return self.__version
+
+    @property
+    def _root_url(self):
+        return self.__root_url
+
+    @property
+    def _schema(self):
+        return self.__schema
+
+    @property
+    def _secure(self):
+        return self.__secure
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Minimal stand-in for the OPA REST API, answering canned responses for offline tests.
+"""
+
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+POLICY = {
+    'result': {
+        'id': 'test',
+        'ast': {
+            'package': {'path': [{'value': 'data'}, {'value': 'test'}, {'value': 'policy'}]},
+            'rules': [{'head': {'name': 'allow'}}, {'head': {'name': 'authorized_users'}}],
+        },
+    }
+}
+
+
+class StubOpa:
+    """Threaded HTTP server replaying queued responses per (method, path)"""
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.responses = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def handle_one(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                stub.requests.append((self.command, self.path, body))
+                stub.connections.add(self.client_address)
+                queue = stub.responses.get((self.command, self.path))
+                if queue:
+                    status, content, delay, headers = queue.pop(0) if len(queue) > 1 else queue[0]
+                else:
+                    status, content, delay, headers = 404, b'{"code": "not_found"}', 0, {}
+                time.sleep(delay)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = handle_one
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_address[1]
+
+    def add(self, method, path, status=200, body=None, delay=0, headers=None):
+        """Queue a response, the last queued response of a route keeps being replayed"""
+        content = body if isinstance(body, bytes) else json.dumps(body or {}).encode()
+        self.responses.setdefault((method, path), []).append(
+            (status, content, delay, headers or {})
+        )
+
+    def count(self, method, path):
+        return sum(1 for request in self.requests if request[:2] == (method, path))
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
@@ -4,10 +4,27 @@ Unit tests for the OpaClient.
 """
 
 
-from unittest import TestCase
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest import TestCase, mock
 
-from opa_client.errors import DeleteDataError, DeletePolicyError
+import requests
+from requests.adapters import HTTPAdapter
+
+from opa_client.errors import (
+    CheckPermissionError,
+    DeleteDataError,
+    DeletePolicyError,
+    RegoParseError,
+    SSLError,
+)
+from opa_client import opa
 from opa_client.opa import OpaClient
+from opa_client.test.stub import POLICY, StubOpa
 
 
 class TestClient(TestCase):
@@ -35,6 +52,27 @@ class TestClient(TestCase):
         self.assertEqual('localhost', self.myclient._host)
         self.assertEqual(8181, self.myclient._port)
 
+        client = OpaClient(' http://localhost ', 8181, 'v1')
+        self.assertEqual('http://localhost:8181/v1', client._root_url)
+        self.assertEqual('localhost', client._host)
+
+        with self.assertRaises(SSLError):
+            OpaClient('http://localhost', 8181, 'v1', ssl=True, cert='cert.pem')
+
+        client = OpaClient('http://[::1]', 8181, 'v1')
+        self.assertEqual('http://[::1]:8181/v1', client._root_url)
+        self.assertEqual('[::1]', client._host)
+
+        client = OpaClient('http://localhost/', 8181, 'v1')
+        self.assertEqual('http://localhost:8181/v1', client._root_url)
+
+        for host in ('', 'http://', 'localhost:9000', '[::1]:9000', 'localhost/v1', 'ftp://opa'):
+            with self.subTest(host=host), self.assertRaises(ValueError):
+                OpaClient(host, 8181, 'v1')
+
+        with OpaClient('localhost', 8181, 'v1') as client:
+            self.assertEqual('http://localhost:8181/v1', client._root_url)
+
     def test_connection_to_opa(self):
         self.assertEqual("Yes I'm here :)", self.myclient.check_connection())
     
@@ -98,6 +136,12 @@ class TestClient(TestCase):
         value_b = {"result": ["alice", "bob"]}
         self.assertEqual(value_a, self.myclient.check_permission(input_data=_input_a, policy_name="test", rule_name="allow"))
         self.assertEqual(value_b, self.myclient.check_permission(input_data=_input_b, policy_name="test", rule_name="authorized_users"))
+        self.assertEqual(
+            [value_a, {'result': False}],
+            self.myclient.check_permissions(
+                input_data_list=[_input_a, _input_b], policy_name='test', rule_name='allow'
+            ),
+        )
 
         self.assertTrue(True, self.myclient.delete_opa_policy('test'))
         with self.assertRaises(DeletePolicyError):
@@ -106,3 +150,220 @@ class TestClient(TestCase):
         self.assertTrue(True, self.myclient.delete_opa_data('test/acl'))
         with self.assertRaises(DeleteDataError):
             self.myclient.delete_opa_data('test/acl')
+
+
+def _response(status_code=200, content=b'{}'):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+class TestTransport(TestCase):
+    def test_verify_uses_opa_cert(self):
+        """The OPA CA bundle wins over the CA bundle environment variables"""
+
+        client = OpaClient('https://127.0.0.1', 8181, 'v1', ssl=True, cert='opa-ca.pem')
+        env = {'REQUESTS_CA_BUNDLE': 'env-ca.pem', 'CURL_CA_BUNDLE': 'env-ca.pem'}
+        with mock.patch.dict(os.environ, env), mock.patch.object(
+            HTTPAdapter, 'send', return_value=_response()
+        ) as send:
+            self.assertTrue(client.check_health())
+
+        self.assertEqual('opa-ca.pem', send.call_args.kwargs['verify'])
+        adapter = client._session.get_adapter('https://127.0.0.1:8181/')
+        self.assertIs(False, adapter.poolmanager.connection_pool_kw['assert_hostname'])
+        client.close()
+
+    def test_policy_download_skips_opa_session(self):
+        """Policies fetched from a url use public CAs and none of the OPA session settings"""
+
+        client = OpaClient('https://127.0.0.1', 8181, 'v1', ssl=True, cert='opa-ca.pem')
+        policy = _response(content=b'package a')
+        with mock.patch(
+            'opa_client.opa.requests.get', return_value=policy
+        ) as get, mock.patch.object(HTTPAdapter, 'send', return_value=_response()) as send:
+            self.assertTrue(client.update_opa_policy_fromurl('https://example.com/a.rego', 'a'))
+
+        get.assert_called_once_with('https://example.com/a.rego', verify=True, timeout=10)
+        self.assertEqual(b'package a', send.call_args.args[0].body)
+        client.close()
+
+    def test_default_timeout(self):
+        """The client timeout applies to every request that does not pass its own"""
+
+        client = OpaClient('127.0.0.1', 8181, 'v1', timeout=0.7)
+        with mock.patch.object(HTTPAdapter, 'send', return_value=_response()) as send:
+            self.assertTrue(client.check_health())
+            client._session.get('http://127.0.0.1:8181/health', timeout=3)
+
+        self.assertEqual(0.7, send.call_args_list[0].kwargs['timeout'])
+        self.assertEqual(3, send.call_args_list[1].kwargs['timeout'])
+
+        # The transport is built once, changing these afterwards would do nothing
+        for name in ('timeout', 'retries', 'pool_size'):
+            with self.subTest(name=name), self.assertRaises(AttributeError):
+                setattr(client, name, 9)
+        client.close()
+
+    def test_gateway_errors_are_retried(self):
+        """502, 503 and 504 are retried up to retries times before giving up"""
+
+        for status in (502, 503, 504):
+            with self.subTest(status=status), StubOpa() as opa:
+                opa.add('GET', '/health', status=status)
+                with OpaClient('127.0.0.1', opa.port, 'v1', retries=2) as client:
+                    self.assertFalse(client.check_health())
+                self.assertEqual(3, opa.count('GET', '/health'))
+
+        with StubOpa() as opa:
+            opa.add('GET', '/health', status=503)
+            opa.add('GET', '/health', status=502)
+            opa.add('GET', '/health')
+            with OpaClient('127.0.0.1', opa.port, 'v1', retries=2) as client:
+                self.assertTrue(client.check_health())
+            self.assertEqual(3, opa.count('GET', '/health'))
+
+    def test_other_errors_are_not_retried(self):
+        """Errors OPA answers on purpose come back on the first try"""
+
+        with StubOpa() as opa:
+            opa.add('GET', '/health', status=500)
+            with OpaClient('127.0.0.1', opa.port, 'v1', retries=2) as client:
+                self.assertFalse(client.check_health())
+            self.assertEqual(1, opa.count('GET', '/health'))
+
+    def test_failed_permission_check_raises(self):
+        """Error statuses and empty or non-JSON bodies raise CheckPermissionError"""
+
+        for status, body in ((500, b''), (503, b'Service Unavailable'), (200, b'')):
+            with self.subTest(status=status, body=body), StubOpa() as opa:
+                opa.add('GET', '/v1/policies/test', body=POLICY)
+                opa.add('POST', '/v1/data/test/policy/allow', status=status, body=body)
+                with OpaClient('127.0.0.1', opa.port, 'v1') as client:
+                    with self.assertRaises(CheckPermissionError) as error:
+                        client.check_permission({'input': {}}, 'test', 'allow')
+                self.assertEqual(status, error.exception.expression)
+
+    def test_failed_policy_upload_raises(self):
+        """OPA parse errors and non-JSON gateway answers both raise RegoParseError"""
+
+        parse_error = {'code': 'invalid_parameter', 'message': 'error(s) occurred'}
+        for status, body, expected in (
+            (400, parse_error, parse_error),
+            (502, b'Bad Gateway', {'message': 'Bad Gateway'}),
+            (500, b'', {}),
+        ):
+            with self.subTest(status=status, body=body), StubOpa() as opa:
+                opa.add('PUT', '/v1/policies/a', status=status, body=body)
+                with OpaClient('127.0.0.1', opa.port, 'v1') as client:
+                    with self.assertRaises(RegoParseError) as error:
+                        client.update_opa_policy_fromstring('package a', 'a')
+                self.assertEqual(status, error.exception.expression)
+                self.assertEqual(expected, error.exception.message)
+
+    def test_policy_from_file_is_streamed_untouched(self):
+        """Policy files are streamed as raw bytes and empty files are not uploaded"""
+
+        with tempfile.TemporaryDirectory() as tmp:
+            policy, empty = os.path.join(tmp, 'a.rego'), os.path.join(tmp, 'empty.rego')
+            with open(policy, 'wb') as wf:
+                wf.write('package a\n# é'.encode())
+            open(empty, 'wb').close()
+
+            with StubOpa() as opa:
+                opa.add('PUT', '/v1/policies/a')
+
+                with OpaClient('127.0.0.1', opa.port, 'v1') as client:
+                    self.assertTrue(client.update_opa_policy_fromfile(policy, 'a'))
+                    self.assertFalse(client.update_opa_policy_fromfile(empty, 'a'))
+
+        self.assertEqual([('PUT', '/v1/policies/a', 'package a\n# é'.encode())], opa.requests)
+
+
+class TestRuleCache(TestCase):
+    def setUp(self):
+        """Serve the test policy and its rules from a stub OPA"""
+
+        self.opa = StubOpa().__enter__()
+        self.addCleanup(self.opa.__exit__)
+        self.opa.add('GET', '/v1/policies/test', body=POLICY)
+        self.opa.add('GET', '/v1/policies/', body={'result': [POLICY['result']]})
+        self.opa.add('POST', '/v1/data/test/policy/allow', body={'result': True})
+        self.opa.add('POST', '/v1/data/test/policy/authorized_users', body={'result': []})
+        self.opa.add('PUT', '/v1/policies/test')
+        self.opa.add('DELETE', '/v1/policies/test')
+
+    def client(self, **kwargs):
+        client = OpaClient('127.0.0.1', self.opa.port, 'v1', **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def policy_fetches(self, client, rule_name='allow'):
+        client.check_permission({'input': {}}, 'test', rule_name)
+        return self.opa.count('GET', '/v1/policies/test')
+
+    def test_rule_urls_are_cached_per_policy(self):
+        client = self.client()
+        self.assertEqual({'result': True}, client.check_permission({'input': {}}, 'test', 'allow'))
+        self.assertEqual(1, self.policy_fetches(client))
+        self.assertEqual(1, self.policy_fetches(client, 'authorized_users'))
+        self.assertEqual(2, self.opa.count('POST', '/v1/data/test/policy/allow'))
+
+    def test_rule_urls_expire_after_ttl(self):
+        client = self.client(cache_ttl=60)
+        self.assertEqual(1, self.policy_fetches(client))
+        monotonic = time.monotonic
+        with mock.patch('time.monotonic', side_effect=lambda: monotonic() + 61):
+            self.assertEqual(2, self.policy_fetches(client))
+
+    def test_invalidate_policy_cache(self):
+        client = self.client()
+        self.assertEqual(1, self.policy_fetches(client))
+
+        client.invalidate_policy_cache('other')
+        self.assertEqual(1, self.policy_fetches(client))
+
+        client.invalidate_policy_cache('test')
+        self.assertEqual(2, self.policy_fetches(client))
+
+        client.invalidate_policy_cache()
+        self.assertEqual(3, self.policy_fetches(client))
+
+    def test_update_and_delete_invalidate_cache(self):
+        client = self.client()
+        self.assertEqual(1, self.policy_fetches(client))
+
+        self.assertTrue(client.update_opa_policy_fromstring('package test.policy', 'test'))
+        self.assertEqual(2, self.policy_fetches(client))
+
+        self.assertTrue(client.delete_opa_policy('test'))
+        self.assertEqual(3, self.policy_fetches(client))
+
+    def test_policies_info_is_cached_and_copied(self):
+        client = self.client()
+        info = client.get_policies_info()
+        root_url = f'http://127.0.0.1:{self.opa.port}/v1'
+        self.assertEqual([f'{root_url}/data/test/policy'], info['test']['path'])
+
+        info['test']['rules'].clear()
+        self.assertEqual(2, len(client.get_policies_info()['test']['rules']))
+        self.assertEqual(1, self.opa.count('GET', '/v1/policies/'))
+
+        client.invalidate_policy_cache()
+        client.get_policies_info()
+        self.assertEqual(2, self.opa.count('GET', '/v1/policies/'))
+
+
+class TestJson(TestCase):
+    def tearDown(self):
+        importlib.reload(opa)
+
+    def test_dumps_matches_stdlib_with_and_without_orjson(self):
+        data = {'input': {1: 'a', 'user': 'alice', 'roles': [1.5, None, True]}}
+        expected = json.loads(json.dumps(data))
+
+        for orjson in (sys.modules.get('orjson'), None):
+            with mock.patch.dict(sys.modules, {'orjson': orjson}):
+                importlib.reload(opa)
+                self.assertEqual(expected, opa._loads(opa._dumps(data)))
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the AsyncOpaClient.
+"""
+
+
+import asyncio
+import json
+import os
+import ssl
+import tempfile
+from unittest import IsolatedAsyncioTestCase, mock
+
+import certifi
+import httpx
+
+from opa_client.errors import CheckPermissionError, DeletePolicyError, RegoParseError
+from opa_client.opa_async import AsyncOpaClient
+from opa_client.test.stub import POLICY, StubOpa
+
+
+class TestAsyncClient(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Set up the test for AsyncOpaClient object"""
+
+        self.myclient = AsyncOpaClient()
+
+    async def asyncTearDown(self):
+        """Close the connection to the OPA server"""
+        await self.myclient.aclose()
+
+    async def test_client(self):
+        """Set up the test for AsyncOpaClient object"""
+
+        async with AsyncOpaClient('localhost', 8181, 'v1') as client:
+            self.assertEqual('http://localhost:8181/v1', client._root_url)
+
+        async with AsyncOpaClient('http://[::1]', 8181, 'v1') as client:
+            self.assertEqual('http://[::1]:8181/v1', client._root_url)
+
+        for host in ('', 'localhost:9000', 'user@localhost', 'localhost/v1'):
+            with self.subTest(host=host), self.assertRaises(ValueError):
+                AsyncOpaClient(host, 8181, 'v1')
+        self.assertEqual('http://', self.myclient._schema)
+        self.assertEqual('v1', self.myclient._version)
+
+    async def test_connection_to_opa(self):
+        self.assertEqual("Yes I'm here :)", await self.myclient.check_connection())
+
+    async def test_check_permission_concurrently(self):
+        new_policy = """
+            package test.async_policy
+
+            import input
+
+            default allow = false
+
+            allow {
+                input.user == "alice"
+            }
+        """
+
+        self.assertEqual(
+            True, await self.myclient.update_opa_policy_fromstring(new_policy, 'async_test')
+        )
+
+        results = await asyncio.gather(
+            self.myclient.check_permission({'input': {'user': 'alice'}}, 'async_test', 'allow'),
+            self.myclient.check_permission({'input': {'user': 'bob'}}, 'async_test', 'allow'),
+        )
+        self.assertEqual([{'result': True}, {'result': False}], results)
+
+        self.assertTrue(await self.myclient.delete_opa_policy('async_test'))
+        with self.assertRaises(DeletePolicyError):
+            await self.myclient.delete_opa_policy('async_test')
+
+
+def _response(status_code=200, content=b'{}'):
+    return httpx.Response(status_code, content=content, request=httpx.Request('GET', 'http://opa'))
+
+
+class TestAsyncTransport(IsolatedAsyncioTestCase):
+    async def test_policy_download_skips_opa_client(self):
+        """Policies fetched from a url do not go through the OPA httpx client"""
+
+        async with AsyncOpaClient('127.0.0.1', 8181, 'v1') as client:
+            policy = _response(content=b'package a')
+            with mock.patch.object(
+                httpx.AsyncClient, 'get', autospec=True, return_value=policy
+            ) as get, mock.patch.object(
+                httpx.AsyncClient, 'put', autospec=True, return_value=_response()
+            ) as put:
+                self.assertTrue(
+                    await client.update_opa_policy_fromurl('https://example.com/a.rego', 'a')
+                )
+
+            self.assertIsNot(client._client, get.call_args.args[0])
+            self.assertTrue(get.call_args.args[0].follow_redirects)
+            self.assertEqual('https://example.com/a.rego', get.call_args.args[1])
+            self.assertEqual(b'package a', put.call_args.kwargs['content'])
+
+        # Raw-file hosts commonly redirect to the actual file
+        with StubOpa() as opa:
+            opa.add('GET', '/old.rego', status=302, headers={'Location': '/a.rego'})
+            opa.add('GET', '/a.rego', body=b'package a')
+            opa.add('PUT', '/v1/policies/a')
+            async with AsyncOpaClient('127.0.0.1', opa.port, 'v1') as client:
+                url = f'http://127.0.0.1:{opa.port}/old.rego'
+                self.assertTrue(await client.update_opa_policy_fromurl(url, 'a'))
+
+        self.assertEqual(('PUT', '/v1/policies/a', b'package a'), opa.requests[-1])
+
+    async def test_verify_uses_opa_cert(self):
+        """The OPA certificate is required but, like OpaClient, its hostname is not checked"""
+
+        cert = certifi.where()
+        async with AsyncOpaClient('https://127.0.0.1', 8181, 'v1', ssl=True, cert=cert) as client:
+            context = client._client._transport._pool._ssl_context
+
+        self.assertEqual(ssl.CERT_REQUIRED, context.verify_mode)
+        self.assertFalse(context.check_hostname)
+
+    async def test_check_permissions_is_bounded_by_pool_size(self):
+        """Plain http has no HTTP/2, so concurrency is capped at pool_size connections"""
+
+        with StubOpa() as opa:
+            opa.add('GET', '/v1/policies/test', body=POLICY)
+            opa.add('POST', '/v1/data/test/policy/allow', body={'result': True}, delay=0.02)
+
+            async with AsyncOpaClient('127.0.0.1', opa.port, 'v1', pool_size=4) as client:
+                results = await client.check_permissions([{'input': {}}] * 20, 'test', 'allow')
+
+        self.assertEqual([{'result': True}] * 20, results)
+        self.assertLessEqual(len(opa.connections), 4)
+
+    async def test_gateway_errors_are_retried(self):
+        """502, 503 and 504 are retried up to retries times, like OpaClient does"""
+
+        for status in (502, 503, 504):
+            with self.subTest(status=status), StubOpa() as opa:
+                opa.add('GET', '/health', status=status)
+                async with AsyncOpaClient('127.0.0.1', opa.port, 'v1', retries=2) as client:
+                    self.assertFalse(await client.check_health())
+                self.assertEqual(3, opa.count('GET', '/health'))
+
+        with StubOpa() as opa:
+            opa.add('POST', '/v1/data/test/policy/allow', status=503)
+            opa.add('POST', '/v1/data/test/policy/allow', body={'result': True})
+            opa.add('GET', '/v1/policies/test', body=POLICY)
+            async with AsyncOpaClient('127.0.0.1', opa.port, 'v1', retries=2) as client:
+                result = await client.check_permission({'input': {'user': 'a'}}, 'test', 'allow')
+            self.assertEqual({'result': True}, result)
+            # The request body is sent again on retry
+            first, second = [body for method, _, body in opa.requests if method == 'POST']
+            self.assertEqual({'input': {'user': 'a'}}, json.loads(first))
+            self.assertEqual(first, second)
+
+        with StubOpa() as opa:
+            opa.add('GET', '/health', status=500)
+            async with AsyncOpaClient('127.0.0.1', opa.port, 'v1', retries=2) as client:
+                self.assertFalse(await client.check_health())
+            self.assertEqual(1, opa.count('GET', '/health'))
+
+    async def test_failed_policy_upload_raises(self):
+        """Non-JSON gateway answers raise RegoParseError, not a decode error"""
+
+        with StubOpa() as opa:
+            opa.add('PUT', '/v1/policies/a', status=502, body=b'Bad Gateway')
+            async with AsyncOpaClient('127.0.0.1', opa.port, 'v1') as client:
+                with self.assertRaises(RegoParseError) as error:
+                    await client.update_opa_policy_fromstring('package a', 'a')
+
+        self.assertEqual(502, error.exception.expression)
+        self.assertEqual({'message': 'Bad Gateway'}, error.exception.message)
+
+    async def test_failed_permission_check_raises(self):
+        """Error statuses and empty or non-JSON bodies raise CheckPermissionError"""
+
+        for status, body in ((500, b''), (503, b'Service Unavailable'), (200, b'')):
+            with self.subTest(status=status, body=body), StubOpa() as opa:
+                opa.add('GET', '/v1/policies/test', body=POLICY)
+                opa.add('POST', '/v1/data/test/policy/allow', status=status, body=body)
+                async with AsyncOpaClient('127.0.0.1', opa.port, 'v1') as client:
+                    with self.assertRaises(CheckPermissionError) as error:
+                        await client.check_permission({'input': {}}, 'test', 'allow')
+                self.assertEqual(status, error.exception.expression)
+
+    async def test_policy_from_file_is_sent_as_bytes(self):
+        """Policy files are read off the event loop and uploaded untouched"""
+
+        with tempfile.TemporaryDirectory() as tmp:
+            policy, empty = os.path.join(tmp, 'a.rego'), os.path.join(tmp, 'empty.rego')
+            with open(policy, 'wb') as wf:
+                wf.write('package a\n# é'.encode())
+            open(empty, 'wb').close()
+
+            with StubOpa() as opa:
+                opa.add('PUT', '/v1/policies/a')
+
+                async with AsyncOpaClient('127.0.0.1', opa.port, 'v1') as client:
+                    self.assertTrue(await client.update_opa_policy_fromfile(policy, 'a'))
+                    self.assertFalse(await client.update_opa_policy_fromfile(empty, 'a'))
+
+        self.assertEqual([('PUT', '/v1/policies/a', 'package a\n# é'.encode())], opa.requests)